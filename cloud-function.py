@@ -27,21 +27,26 @@
 #         - Formats a textual response for Slack indicating the resource's status.
 #
 # 4.  Slack Signature Verification (`verify_slack_signature`):
-#     - Crucial security step. Uses the `slack_sdk` to verify that requests genuinely
-#       originate from Slack, preventing spoofing. Relies on the `SLACK_SIGNING_SECRET`
-#       environment variable.
+#     - Crucial security step. Computes Slack's v0 HMAC-SHA256 signature over the raw
+#       request body to verify that requests genuinely originate from Slack, preventing
+#       spoofing. Relies on the `SLACK_SIGNING_SECRET` environment variable.
 #
 # 5.  Configuration:
 #     - Heavily relies on environment variables for:
-#         - `SLACK_SIGNING_SECRET`: For request verification.
+#         - `SLACK_SIGNING_SECRET`: For request verification. The function refuses to start without it.
+#         - `SKIP_SLACK_VERIFY`: Optional, development only. Set to `true` to skip signature verification.
 #         - `BIGQUERY_PROJECT_ID`: GCP Project ID for BigQuery.
 #         - `BIGQUERY_DATASET_ID`: BigQuery Dataset ID.
 #         - `INSTANCES_TABLE_ID`: BigQuery Table ID for general resource information.
 #         - `STATUS_CHECK_TABLE_ID`: BigQuery Table ID for resource status checks.
 #
-# 6.  Logging:
+# 6.  Dependencies:
+#     - `google-cloud-bigquery>=3.14` (for `Client.query_and_wait`), `google-cloud-logging`,
+#       `functions-framework` and `orjson` (for response serialization).
+#
+# 7.  Logging:
 #     - Uses Google Cloud Logging for structured logging throughout the execution flow,
-#       aiding in debugging and monitoring.
+#       aiding in debugging and monitoring. Records are emitted by the `gcf.slack` logger.
 #
 # Expected Slack Commands (examples):
 #   /getinfo <resource-name>
@@ -52,18 +57,25 @@
 # --- END SCRIPT OVERVIEW ---
 
 import functions_framework
-from google.cloud import bigquery
+import hashlib
+import hmac
+import orjson
+from flask import Response
 from google.cloud import logging as cloud_logging
 import logging
 import os
-import json
 import re
-from slack_sdk.signature import SignatureVerifier
+import string
+import threading
+import time
 from datetime import datetime # Added for generic timestamp formatting
 
 # Set up Google Cloud logging client
 logging_client = cloud_logging.Client()
 logging_client.setup_logging()
+# Module logger: avoids going through the root logger on every call and tags each Cloud Logging
+# record with a name that can be filtered on (and have its level set) independently.
+logger = logging.getLogger("gcf.slack")
 
 # --- Configuration Constants (better as environment variables) ---
 # TODO: Replace these default values or ensure environment variables are set.
@@ -75,8 +87,147 @@ STATUS_CHECK_TABLE_ID = os.environ.get("STATUS_CHECK_TABLE_ID", "your_status_che
 
 # Essential: Environment variable for Slack signing secret
 # You MUST configure this environment variable in your Cloud Function settings.
-# SLACK_SIGNING_SECRET = os.environ.get("SLACK_SIGNING_SECRET")
-# The verify_slack_signature function already uses os.environ["SLACK_SIGNING_SECRET"]
+SLACK_SIGNING_SECRET = os.environ.get("SLACK_SIGNING_SECRET")
+# Development/testing only: set SKIP_SLACK_VERIFY=true to accept unsigned requests.
+# NEVER enable this in production.
+SKIP_SLACK_VERIFY = os.environ.get("SKIP_SLACK_VERIFY", "").lower() in ("1", "true", "yes")
+
+# Fail at startup rather than on every request when the secret is missing.
+if not SLACK_SIGNING_SECRET and not SKIP_SLACK_VERIFY:
+    raise RuntimeError("CRITICAL: The SLACK_SIGNING_SECRET environment variable is not set.")
+
+
+def _get_bigquery():
+    """
+    Imports google.cloud.bigquery on first use. The library is large, so deferring it keeps
+    cold starts fast for requests that never reach BigQuery (bad signature, unknown command, etc.).
+    """
+    global _bigquery
+    if _bigquery is None:
+        from google.cloud import bigquery
+        _bigquery = bigquery
+    return _bigquery
+
+def _build_bigquery_client():
+    """
+    Creates the BigQuery client on top of an authorized session with an explicit
+    connection pool, so TLS connections stay open between warm invocations.
+    """
+    import google.auth
+    from google.auth.transport.requests import AuthorizedSession
+    from requests.adapters import HTTPAdapter
+
+    bigquery = _get_bigquery()
+    credentials, _ = google.auth.default(scopes=bigquery.Client.SCOPE)
+    session = AuthorizedSession(credentials)
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20, pool_block=False)
+    session.mount("https://", adapter)
+    return bigquery.Client(credentials=credentials, _http=session)
+
+def _get_bigquery_client():
+    """
+    Returns the shared BigQuery client, creating it on first use.
+    """
+    global _BQ_CLIENT
+    if _BQ_CLIENT is None:
+        _BQ_CLIENT = _build_bigquery_client()
+    return _BQ_CLIENT
+
+
+# --- BigQuery queries (table names are fixed per deployment, so they are rendered once) ---
+# TODO: Adapt this query to your instance/resource table schema.
+# Ensure that the fields you select (instance_id, instance_name, project_id, status, etc.)
+# exist in your table or adjust them accordingly.
+_GET_INFO_SQL = f"""
+    SELECT
+        instance_id,
+        instance_name,
+        project_id,  -- Ensure this field exists if you want to use it
+        status,
+        zone,
+        machine_type,
+        creation_timestamp, -- Or any date/time field you have
+        -- Example of generic label fields you might have:
+        -- labels.environment AS label_environment,
+        -- labels.owner AS label_owner,
+        CONCAT('https://console.cloud.google.com/compute/instancesDetail/zones/', zone, '/instances/', instance_name, '?project=', project_id) AS instance_console_url
+    FROM `{BIGQUERY_PROJECT_ID}.{BIGQUERY_DATASET_ID}.{INSTANCES_TABLE_ID}`
+    WHERE LOWER(instance_name) = @resource_name OR LOWER(instance_id) = @resource_name
+    LIMIT 2 -- Limit in case of duplicates or to avoid overloading
+"""
+
+# TODO: Adapt this query to your "status" or "checks" table schema.
+# Ensure that the fields you select (item_name, current_status, details, last_checked)
+# exist in your table or adjust them accordingly.
+_STATUS_SQL = f"""
+    SELECT
+        item_name,      -- Name of the item/resource
+        current_status, -- Current status of the check
+        details,        -- Additional details
+        last_checked    -- Timestamp of the last check
+    FROM `{BIGQUERY_PROJECT_ID}.{BIGQUERY_DATASET_ID}.{STATUS_CHECK_TABLE_ID}`
+    WHERE LOWER(item_name) = @resource_name
+    LIMIT 1
+"""
+
+# --- Global clients (reused across warm invocations) ---
+# Created once per instance so warm requests reuse credentials and HTTP connections
+# instead of paying the setup cost on every call.
+_bigquery = None  # google.cloud.bigquery module, imported lazily by _get_bigquery()
+_BQ_CLIENT = None  # Built on first BigQuery lookup by _get_bigquery_client()
+# Signing secret encoded once for HMAC. Left as None only when verification is disabled with SKIP_SLACK_VERIFY.
+_SLACK_SECRET_BYTES = SLACK_SIGNING_SECRET.encode('utf-8') if SLACK_SIGNING_SECRET else None
+# Requests older (or newer) than this many seconds are rejected as possible replays.
+_SLACK_MAX_REQUEST_AGE = 60 * 5
+# "v0=" followed by a hex-encoded HMAC-SHA256 digest.
+_SLACK_SIGNATURE_LENGTH = len("v0=") + 64
+
+# --- In-memory response cache (per warm instance) ---
+# Repeated lookups for the same (command, parameter) within the TTL are answered from memory
+# instead of querying BigQuery again. Oldest entries are evicted first once the cap is reached.
+_QUERY_CACHE = {}  # (command, parameter) -> (stored_at, response_payload)
+_CACHE_TTL = 30.0  # seconds
+_CACHE_MAX_ENTRIES = 256
+# functions-framework may serve requests on several threads, so evict-and-insert is serialized.
+_QUERY_CACHE_LOCK = threading.Lock()
+
+# --- Status classification for /checkstatus ---
+# TODO: Adapt this status logic to your needs
+# Each rule is (keywords, emoji, message template); a rule matches when any keyword
+# appears in the lower-cased status. Rules are checked in order.
+_STATUS_RULES = (
+    (("active", "ok", "complete"), "✅", "Resource *{name}* has a favorable status: *{status}*."),
+    (("pending", "in progress"), "⏳", "Resource *{name}* has status: *{status}*."),
+)
+_STATUS_DEFAULT = ("❌", "Resource *{name}* requires attention. Status: *{status}*.")
+
+# --- Parameter sanitization (compiled once at import) ---
+# Allowed characters: alphanumeric, underscores, and hyphens.
+_ALLOWED_PARAMETER_CHARS = frozenset(string.ascii_letters + string.digits + '-_')
+_SANITIZE_RE = re.compile(r'[^a-zA-Z0-9\-_]')
+# The parameter is already stripped, so any remaining whitespace means more than one token.
+_WHITESPACE_RE = re.compile(r'\s')
+# Deletion table for the ASCII fast path; str.translate runs entirely in C.
+_SANITIZE_TABLE = str.maketrans('', '', ''.join(chr(i) for i in range(128) if chr(i) not in _ALLOWED_PARAMETER_CHARS))
+
+
+# --- Static responses (built once; never mutated by the handlers) ---
+_ERR_NO_COMMAND = {
+    "response_type": "ephemeral",
+    "text": "Error: No command was provided."
+}
+_ERR_GENERAL = {
+    "response_type": "ephemeral",
+    "text": "Sorry, an error occurred while processing your request. Please try again later."
+}
+_ERR_WRONG_CONTENT_TYPE = ("This request does not appear to be from Slack (incorrect Content-Type).", 400)
+
+
+def _json_response(payload):
+    """
+    Serializes a Slack response payload with orjson and wraps it in a Flask response.
+    """
+    return Response(orjson.dumps(payload), mimetype='application/json')
 
 
 @functions_framework.http
@@ -87,129 +238,132 @@ def request_handler(request):
     """
     try:
         if request.headers.get('Content-Type') == 'application/x-www-form-urlencoded': # Comes from Slack
-            # Verify Slack signature before processing
+            # Verify Slack signature before any other processing so forged requests are rejected early
             verify_slack_signature(request)
-            logging.info(f"Slack request received. Headers: {dict(request.headers)}")
-            logging.info(f"Request body (form): {json.dumps(dict(request.form), indent=2)}")
+            logger.debug("Slack request received. Timestamp: %s, Signature: %s",
+                         request.headers.get('X-Slack-Request-Timestamp'), request.headers.get('X-Slack-Signature'))
 
             input_data = request.form
             command = input_data.get('command', '').strip()
             parameter = input_data.get('text', '').strip()
 
             if not command:
-                logging.warning("Command not provided in Slack request.")
-                return {
-                    "response_type": "ephemeral",
-                    "text": "Error: No command was provided."
-                }
+                logger.warning("Command not provided in Slack request.")
+                return _json_response(_ERR_NO_COMMAND)
 
-            if not parameter or len(parameter.split()) > 1:
-                logging.info(f"WARNING: A single parameter was expected for command '{command}'. Example: {command} my-resource")
-                return {
+            if not parameter or _WHITESPACE_RE.search(parameter):
+                logger.info("WARNING: A single parameter was expected for command '%s'. Example: %s my-resource", command, command)
+                return _json_response({
                     "response_type": "ephemeral",
                     "text": f"Error: A single parameter was expected. Example: {command} my-resource"
-                }
+                })
 
             # Sanitize parameter: allow only alphanumeric, underscores, and hyphens.
-            parameter = re.sub(r'[^a-zA-Z0-9\-_]', '', parameter).lower()
-            logging.info(f"Command '{command}' received with sanitized parameter: '{parameter}'")
-
-            return menu_controller(command, parameter)
+            # Plain ASCII input (the usual case) goes through the translate table; anything
+            # else falls back to the regex so non-ASCII characters are still stripped.
+            if parameter.isascii():
+                parameter = parameter.translate(_SANITIZE_TABLE).lower()
+            else:
+                parameter = _SANITIZE_RE.sub('', parameter).lower()
+            logger.info("Command '%s' received with sanitized parameter: '%s'", command, parameter)
+
+            return _json_response(menu_controller(command, parameter))
         else:
-            logging.warning(f"Request received with unexpected Content-Type: {request.headers.get('Content-Type')}")
-            logging.debug(f"Content of invalid request: {request.get_data(as_text=True)}")
-            return ("This request does not appear to be from Slack (incorrect Content-Type).", 400)
+            logger.warning("Request received with unexpected Content-Type: %s", request.headers.get('Content-Type'))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Content of invalid request: %s", request.get_data(as_text=True))
+            return _ERR_WRONG_CONTENT_TYPE
 
     except ValueError as ve: # Specifically for signature or validation errors
-        logging.error(f"Validation or signature error: {str(ve)}")
-        return {
+        logger.error("Validation or signature error: %s", ve)
+        return _json_response({
             "response_type": "ephemeral",
             "text": f"Validation Error: {str(ve)}"
-        }
+        })
     except Exception as e:
-        error_msg = str(e)
-        logging.exception(f"GENERAL ERROR: Error processing request: {error_msg}") # Use logging.exception to include traceback
-        return {
-            "response_type": "ephemeral",
-            "text": f"Sorry, an error occurred while processing your request. Please try again later."
-        }
+        logger.exception("GENERAL ERROR: Error processing request: %s", e) # Use logger.exception to include traceback
+        return _json_response(_ERR_GENERAL)
 
 def menu_controller(command, parameter):
     """
     Routes the received command to the appropriate handler.
     """
-    logging.info(f"Processing command '{command}' with parameter '{parameter}'")
+    logger.info("Processing command '%s' with parameter '%s'", command, parameter)
+
+    cache_key = (command, parameter)
+    cached = _QUERY_CACHE.get(cache_key)
+    if cached and time.monotonic() - cached[0] < _CACHE_TTL:
+        logger.info("Returning cached response for command '%s' with parameter '%s'", command, parameter)
+        return cached[1]
 
     if command == '/getinfo': # Generic command to get information
         response_payload = get_resource_info(parameter)
+        _store_cached_response(cache_key, response_payload)
         return response_payload
 
     elif command == '/checkstatus': # Generic command to check status
         response_payload = check_resource_status(parameter)
+        _store_cached_response(cache_key, response_payload)
         return response_payload
 
     else:
-        logging.warning(f"Unknown command: {command}")
+        logger.warning("Unknown command: %s", command)
         return {
             "response_type": "ephemeral",
             "text": f"Command '{command}' not recognized."
         }
 
-def get_resource_info(resource_name):
+def _store_cached_response(cache_key, response_payload):
     """
-    Retrieves information for a resource (e.g., a VM) from BigQuery and formats it for Slack.
+    Stores a response in the in-memory cache, evicting the oldest entry when full.
+    """
+    with _QUERY_CACHE_LOCK:
+        _QUERY_CACHE.pop(cache_key, None) # Re-insert so the entry moves to the end of the FIFO order
+        if len(_QUERY_CACHE) >= _CACHE_MAX_ENTRIES:
+            _QUERY_CACHE.pop(next(iter(_QUERY_CACHE), None), None)
+        _QUERY_CACHE[cache_key] = (time.monotonic(), response_payload)
+
+def _format_timestamp(value):
     """
-    client = bigquery.Client()
-    # TODO: Adapt this query to your instance/resource table schema.
-    # Ensure that the fields you select (instance_id, instance_name, project_id, status, etc.)
-    # exist in your table or adjust them accordingly.
-    query = f"""
-        SELECT
-            instance_id,
-            instance_name,
-            project_id,  -- Ensure this field exists if you want to use it
-            status,
-            zone,
-            machine_type,
-            creation_timestamp, -- Or any date/time field you have
-            -- Example of generic label fields you might have:
-            -- labels.environment AS label_environment,
-            -- labels.owner AS label_owner,
-            CONCAT('https://console.cloud.google.com/compute/instancesDetail/zones/', zone, '/instances/', instance_name, '?project=', project_id) AS instance_console_url
-        FROM `{BIGQUERY_PROJECT_ID}.{BIGQUERY_DATASET_ID}.{INSTANCES_TABLE_ID}`
-        WHERE LOWER(instance_name) = @resource_name OR LOWER(instance_id) = @resource_name
-        LIMIT 2 -- Limit in case of duplicates or to avoid overloading
+    Formats a BigQuery timestamp as "DD-MM-YYYY at HH:MM UTC" for Slack messages.
+    Datetimes are formatted directly from their fields, skipping the locale-aware strftime.
     """
+    if not value:
+        return "Not available"
+    if isinstance(value, datetime):
+        return f"{value.day:02d}-{value.month:02d}-{value.year} at {value.hour:02d}:{value.minute:02d} UTC"
+    if hasattr(value, 'strftime'): # e.g. a DATE column
+        return value.strftime("%d-%m-%Y at %H:%M UTC")
+    return str(value)
 
+def get_resource_info(resource_name):
+    """
+    Retrieves information for a resource (e.g., a VM) from BigQuery and formats it for Slack.
+    """
+    bigquery = _get_bigquery()
+    client = _get_bigquery_client()
     job_config = bigquery.QueryJobConfig(
         query_parameters=[
             bigquery.ScalarQueryParameter("resource_name", "STRING", resource_name)
-        ]
+        ],
+        use_query_cache=True, # Identical lookups can be served from BigQuery's results cache
+        use_legacy_sql=False
     )
 
-    logging.info(f"Executing BigQuery query to get resource information: {resource_name}")
-    results = client.query(query, job_config=job_config).result()
-    rows = list(results)
-
-    if not rows:
-        logging.warning(f"No information found for resource: {resource_name}")
-        return {
-            "response_type": "ephemeral",
-            "text": f"No information found for resource: *{resource_name}*."
-        }
-
-    logging.info(f"Found {len(rows)} records for resource: {resource_name}")
+    logger.info("Executing BigQuery query to get resource information: %s", resource_name)
+    # query_and_wait (google-cloud-bigquery >= 3.14) uses the synchronous jobs.query API,
+    # returning small result sets inline instead of inserting a job and polling for it.
+    results = client.query_and_wait(_GET_INFO_SQL, job_config=job_config)
 
+    # Iterate the result directly instead of materializing it into a list first
+    row_count = 0
     blocks = []
-    for row in rows:
-        # Format timestamp if it exists and is a datetime object
-        formatted_time = "Not available"
-        if row.creation_timestamp and hasattr(row.creation_timestamp, 'strftime'):
-            formatted_time = row.creation_timestamp.strftime("%d-%m-%Y at %H:%M UTC")
-        elif row.creation_timestamp:
-            formatted_time = str(row.creation_timestamp)
-
+    extend_blocks = blocks.extend # Bound once instead of looked up on every row
+    for row in results:
+        row_count += 1
+        formatted_time = _format_timestamp(row.creation_timestamp)
 
+        # Adjacent f-strings are joined at compile time, so this builds the message in a single pass
         message_text = (
             f"ℹ️ Information for *{row.instance_name or 'N/A'}* (ID: *{row.instance_id or 'N/A'}*):\n"
             f"   • Project: *{row.project_id or 'N/A'}*\n"
@@ -222,12 +376,13 @@ def get_resource_info(resource_name):
             f"   • Created/Updated: _{formatted_time}_"
         )
 
-        blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": message_text}})
+        section_block = {"type": "section", "text": {"type": "mrkdwn", "text": message_text}}
 
         action_elements = []
-        if row.instance_console_url: # Make sure instance_console_url is selected in your query and exists
+        console_url = row.instance_console_url # Make sure instance_console_url is selected in your query and exists
+        if console_url:
             action_elements.append(
-                {"type": "button", "text": {"type": "plain_text", "text": "🔗 Open in GCP Console", "emoji": True}, "url": row.instance_console_url}
+                {"type": "button", "text": {"type": "plain_text", "text": "🔗 Open in GCP Console", "emoji": True}, "url": console_url}
             )
         # You can add more buttons if you have other relevant URLs or actions
         # Example:
@@ -237,9 +392,20 @@ def get_resource_info(resource_name):
         #         "url": f"https://console.cloud.google.com/home/dashboard?project={row.project_id}"}
         #    )
 
+        # Add all of this row's blocks with a single extend
         if action_elements:
-            blocks.append({"type": "actions", "elements": action_elements})
-        blocks.append({"type": "divider"})
+            extend_blocks((section_block, {"type": "actions", "elements": action_elements}, {"type": "divider"}))
+        else:
+            extend_blocks((section_block, {"type": "divider"}))
+
+    if not row_count:
+        logger.warning("No information found for resource: %s", resource_name)
+        return {
+            "response_type": "ephemeral",
+            "text": f"No information found for resource: *{resource_name}*."
+        }
+
+    logger.info("Found %d records for resource: %s", row_count, resource_name)
 
     # Remove the last divider if it exists
     if blocks and blocks[-1]["type"] == "divider":
@@ -255,60 +421,45 @@ def check_resource_status(resource_name):
     """
     Checks the status of a resource (e.g., if it has a specific configuration) from BigQuery.
     """
-    client = bigquery.Client()
-    # TODO: Adapt this query to your "status" or "checks" table schema.
-    # Ensure that the fields you select (item_name, current_status, details, last_checked)
-    # exist in your table or adjust them accordingly.
-    query = f"""
-        SELECT
-            item_name,      -- Name of the item/resource
-            current_status, -- Current status of the check
-            details,        -- Additional details
-            last_checked    -- Timestamp of the last check
-        FROM `{BIGQUERY_PROJECT_ID}.{BIGQUERY_DATASET_ID}.{STATUS_CHECK_TABLE_ID}`
-        WHERE LOWER(item_name) = @resource_name
-        LIMIT 1
-    """
-
+    bigquery = _get_bigquery()
+    client = _get_bigquery_client()
     job_config = bigquery.QueryJobConfig(
         query_parameters=[
             bigquery.ScalarQueryParameter("resource_name", "STRING", resource_name)
-        ]
+        ],
+        use_query_cache=True, # Identical lookups can be served from BigQuery's results cache
+        use_legacy_sql=False
     )
 
-    logging.info(f"Executing BigQuery query to check resource status: {resource_name}")
-    results = client.query(query, job_config=job_config).result()
-    rows = list(results)
+    logger.info("Executing BigQuery query to check resource status: %s", resource_name)
+    # query_and_wait (google-cloud-bigquery >= 3.14) uses the synchronous jobs.query API,
+    # returning small result sets inline instead of inserting a job and polling for it.
+    results = client.query_and_wait(_STATUS_SQL, job_config=job_config)
+    # Only the first row is needed (LIMIT 1), so don't build a list around it
+    row = next(iter(results), None)
 
-    if not rows:
-        logging.info(f"Resource '{resource_name}' not found in the status check table.")
+    if row is None:
+        logger.info("Resource '%s' not found in the status check table.", resource_name)
         return {
             "response_type": "ephemeral",
             "text": f"❓ Resource *{resource_name}* was not found for status check."
         }
 
-    row = rows[0]
-    logging.info(f"Record found for '{resource_name}': {dict(row)}")
+    # Converting the row to a dict is only worth it when debug logging is enabled
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Record found for '%s': %s", resource_name, dict(row))
 
     status_value = str(row.current_status).lower() if row.current_status is not None else "unknown"
     details_value = row.details or "No additional details."
-    last_checked_time = "Not available"
-    if row.last_checked and hasattr(row.last_checked, 'strftime'):
-        last_checked_time = row.last_checked.strftime("%d-%m-%Y at %H:%M UTC")
-    elif row.last_checked:
-        last_checked_time = str(row.last_checked)
-
-
-    # TODO: Adapt this status logic to your needs
-    if "active" in status_value or "ok" in status_value or "complete" in status_value:
-        emoji = "✅"
-        message = f"Resource *{row.item_name or resource_name}* has a favorable status: *{row.current_status or 'N/A'}*."
-    elif "pending" in status_value or "in progress" in status_value:
-        emoji = "⏳"
-        message = f"Resource *{row.item_name or resource_name}* has status: *{row.current_status or 'N/A'}*."
-    else:
-        emoji = "❌"
-        message = f"Resource *{row.item_name or resource_name}* requires attention. Status: *{row.current_status or 'N/A'}*."
+    last_checked_time = _format_timestamp(row.last_checked)
+
+    # First matching rule in _STATUS_RULES wins; anything else falls back to _STATUS_DEFAULT
+    emoji, template = next(
+        ((rule_emoji, rule_template) for keywords, rule_emoji, rule_template in _STATUS_RULES
+         if any(keyword in status_value for keyword in keywords)),
+        _STATUS_DEFAULT
+    )
+    message = template.format(name=row.item_name or resource_name, status=row.current_status or 'N/A')
 
     full_response_text = (
         f"{emoji} {message}\n"
@@ -324,30 +475,44 @@ def check_resource_status(resource_name):
 def verify_slack_signature(request):
     """
     Verifies the Slack request signature to ensure it's authentic.
-    Uses the "SLACK_SIGNING_SECRET" environment variable.
+    Uses the secret from the "SLACK_SIGNING_SECRET" environment variable.
     """
-    slack_signing_secret = os.environ.get("SLACK_SIGNING_SECRET")
-    if not slack_signing_secret:
-        logging.error("CRITICAL: The SLACK_SIGNING_SECRET environment variable is not set.")
-        # In a production environment, you might want to fail more strictly here.
-        # For development/testing, you could allow it to proceed with a warning,
-        # but NEVER in production without verification.
-        raise ValueError("Server configuration does not include Slack signing secret. Verification skipped (INSECURE).")
-
+    if SKIP_SLACK_VERIFY:
+        logger.warning("SKIP_SLACK_VERIFY is enabled. Slack signature verification skipped (INSECURE).")
+        return True
 
-    verifier = SignatureVerifier(slack_signing_secret)
-    request_body = request.get_data(as_text=True) # Slack sends data as application/x-www-form-urlencoded
     timestamp = request.headers.get('X-Slack-Request-Timestamp', '')
     signature = request.headers.get('X-Slack-Signature', '')
 
-    logging.debug(f"Verifying signature: Timestamp='{timestamp}', Signature='{signature}'")
-    # logging.debug(f"Request Body for signature: {request_body}") # Be careful with sensitive data in logs
+    logger.debug("Verifying signature: Timestamp='%s', Signature='%s'", timestamp, signature)
+
+    # Cheap checks first, so malformed or replayed requests never reach the HMAC computation
+    try:
+        request_timestamp = int(timestamp)
+    except ValueError:
+        logger.error("Error: Missing or malformed Slack request timestamp.")
+        raise ValueError("Invalid Slack request timestamp.")
+    # Integer arithmetic: a huge timestamp must not overflow a float conversion
+    if abs(int(time.time()) - request_timestamp) > _SLACK_MAX_REQUEST_AGE:
+        logger.error("Error: Slack request timestamp is outside the allowed window (possible replay).")
+        raise ValueError("Stale Slack request.")
+    if len(signature) != _SLACK_SIGNATURE_LENGTH or not signature.startswith('v0=') or not signature.isascii():
+        logger.error("Error: Malformed Slack signature.")
+        raise ValueError("Invalid Slack signature.")
+
+    # Slack signs the raw bytes of the form body, so hash them directly without decoding to text
+    request_body = request.get_data()
+    # logger.debug("Request Body for signature: %s", request_body) # Be careful with sensitive data in logs
 
-    if not verifier.is_valid(body=request_body, timestamp=timestamp, signature=signature):
-        logging.error("Error: Invalid Slack signature.")
+    # Signature base string is "v0:<timestamp>:<body>"
+    mac = hmac.new(_SLACK_SECRET_BYTES, b"v0:" + timestamp.encode('utf-8') + b":", hashlib.sha256)
+    mac.update(request_body)
+    expected_signature = "v0=" + mac.hexdigest()
+    if not hmac.compare_digest(expected_signature, signature): # Constant-time comparison
+        logger.error("Error: Invalid Slack signature.")
         raise ValueError("Invalid Slack signature.")
 
-    logging.info("Slack signature verified successfully.")
+    logger.info("Slack signature verified successfully.")
     return True
 
 # Example of how you might want to test locally (this doesn't run in Cloud Functions directly)